@@ -0,0 +1,71 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'utils'))
+
+from compare_entsoe_omie import compare_prices, corr, stats_kernel
+
+
+def _prices_with_nan():
+    rng = np.random.default_rng(0)
+    x = rng.uniform(0, 150, 168).astype(np.float32)
+    y = (x + rng.normal(0, 20, 168)).astype(np.float32)
+    x[10] = np.nan
+    y[50] = np.nan
+    return x, y
+
+
+def test_corr_skips_nan_pairs_like_pandas():
+    x, y = _prices_with_nan()
+    expected = pd.Series(x, dtype=np.float64).corr(pd.Series(y, dtype=np.float64))
+    assert np.isclose(corr(x, y), expected, rtol=1e-5)
+
+
+def test_corr_needs_two_pairs():
+    assert np.isnan(corr(np.array([1.0, np.nan]), np.array([np.nan, 2.0])))
+
+
+def test_stats_kernel_skips_nan_pairs_like_pandas():
+    x, y = _prices_with_nan()
+    diff = pd.Series(x, dtype=np.float64) - pd.Series(y, dtype=np.float64)
+    mean, dmax, dmin, std, rmse = stats_kernel(x, y)
+    expected = (diff.mean(), diff.max(), diff.min(), diff.std(), np.sqrt((diff ** 2).mean()))
+    assert np.allclose((mean, dmax, dmin, std, rmse), expected, rtol=1e-5)
+
+
+def test_stats_kernel_constant_offset_std():
+    rng = np.random.default_rng(1)
+    for dtype in (np.float64, np.float32):
+        for offset in (0.12, 0.3, 1.37, 2.86, 3.86, 5.01):
+            x = np.round(rng.uniform(0, 150, 144), 2)
+            y = np.round(x + offset, 2)
+            x = x.astype(dtype)
+            y = y.astype(dtype)
+            diff = pd.Series(x, dtype=np.float64) - pd.Series(y, dtype=np.float64)
+            mean, _, _, std, _ = stats_kernel(x, y)
+            assert not np.isnan(std)
+            assert np.isclose(std, diff.std(), atol=1e-6)
+            assert np.isclose(mean, -offset, atol=1e-4)
+
+
+def test_compare_prices_tolerates_missing_hours():
+    utc = pd.date_range('2025-08-09 22:00', periods=48, freq='h', tz='UTC')
+    rng = np.random.default_rng(2)
+    prices = rng.uniform(0, 150, 48).astype(np.float32)
+    
+    entsoe_pt = pd.DataFrame({'price_eur_mwh': prices}, index=utc.tz_convert('Europe/Lisbon'))
+    entsoe_es = pd.DataFrame({'price_eur_mwh': prices}, index=utc.tz_convert('Europe/Madrid'))
+    omie_data = pd.DataFrame({'price_pt_omie': prices + 1, 'price_es_omie': prices + 1}, index=utc)
+    # Uma hora em falta no OMIE e outra na ENTSO-E ES
+    omie_data = omie_data.drop(utc[5])
+    entsoe_es = entsoe_es.iloc[[i for i in range(48) if i != 30]]
+    
+    results = compare_prices(entsoe_pt, entsoe_es, omie_data)
+    
+    assert len(results['common_index']) == 46
+    assert utc[5] not in results['common_index']
+    assert utc[30] not in results['common_index']
+    assert np.isclose(results['pt_mean'], -1.0, atol=1e-4)
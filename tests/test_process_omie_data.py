@@ -0,0 +1,63 @@
+import os
+import sys
+from datetime import datetime
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'utils'))
+
+from process_omie_data import parse_omie_file
+
+
+def _write_omie_file(path, es_fields, pt_fields):
+    content = (
+        "OMIE - Mercado de electricidad;Fecha Emisión :09/08/2025 - 13:05;;10/08/2025;"
+        "Precio del mercado diario (EUR/MWh);;;;\r\n"
+        ";\r\n"
+        ";" + ";".join(str(h) for h in range(1, 25)) + ";\r\n"
+        "Precio marginal en el sistema español (EUR/MWh);" + ";".join(es_fields) + ";\r\n"
+        "Precio marginal en el sistema portugués (EUR/MWh);" + ";".join(pt_fields) + ";\r\n"
+    )
+    path.write_bytes(content.encode('latin-1'))
+
+
+def test_parse_omie_file(tmp_path):
+    es = [f"{h},5" for h in range(24)]
+    pt = [f"{h + 100},25" for h in range(24)]
+    file_path = tmp_path / "marginalpdbc_20250810.TXT"
+    _write_omie_file(file_path, es, pt)
+    
+    (file_date, datetime_utc, prices_es, prices_pt), error = parse_omie_file(str(file_path))
+    
+    assert error is None
+    
+    assert file_date == datetime(2025, 8, 9)
+    assert len(datetime_utc) == 24
+    assert str(datetime_utc[0]).startswith('2025-08-08T22:00')
+    np.testing.assert_allclose(prices_es, np.arange(24) + 0.5)
+    np.testing.assert_allclose(prices_pt, np.arange(24) + 100.25)
+
+
+def test_parse_omie_file_skips_empty_and_invalid_fields(tmp_path):
+    es = ["104,72", "", "85,44", "n/a"] + [f"{h},00" for h in range(2, 24)]
+    pt = [f"{h},00" for h in range(24)]
+    file_path = tmp_path / "marginalpdbc_20250810.TXT"
+    _write_omie_file(file_path, es, pt)
+    
+    (_, datetime_utc, prices_es, prices_pt), error = parse_omie_file(str(file_path))
+    
+    assert error is None
+    
+    np.testing.assert_allclose(prices_es[:3], [104.72, 85.44, 2.0])
+    assert len(prices_es) == 24
+    assert len(datetime_utc) == 24
+
+
+def test_parse_omie_file_reports_missing_prices(tmp_path):
+    file_path = tmp_path / "marginalpdbc_20250810.TXT"
+    file_path.write_bytes(b"OMIE - Mercado de electricidad;10/08/2025;\r\n")
+    
+    result, error = parse_omie_file(str(file_path))
+    
+    assert result is None
+    assert "preços" in error
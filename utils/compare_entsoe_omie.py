@@ -6,18 +6,73 @@ Compara os arquivos já processados e salvos
 
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+from pyarrow import csv as pa_csv
+from numba import njit
 from datetime import datetime
 import os
 
+@njit(cache=True)
+def stats_kernel(a, b):
+    """Estatísticas da diferença a - b numa única passagem
+
+    Retorna (média, máximo, mínimo, desvio padrão, RMSE).
+    Pares com NaN são ignorados, como no pandas.
+    """
+    n = 0
+    mean = 0.0
+    m2 = 0.0
+    sum_d2 = 0.0
+    dmin = np.inf
+    dmax = -np.inf
+    
+    for i in range(a.shape[0]):
+        x = a[i]
+        y = b[i]
+        if np.isnan(x) or np.isnan(y):
+            continue
+        d = np.float64(x) - np.float64(y)
+        n += 1
+        # Welford: média e soma dos quadrados dos desvios atualizadas a cada elemento
+        delta = d - mean
+        mean += delta / n
+        m2 += delta * (d - mean)
+        sum_d2 += d * d
+        if d < dmin:
+            dmin = d
+        if d > dmax:
+            dmax = d
+    
+    if n == 0:
+        return np.nan, np.nan, np.nan, np.nan, np.nan
+    
+    rmse = np.sqrt(sum_d2 / n)
+    std = np.sqrt(max(m2, 0.0) / (n - 1)) if n > 1 else np.nan
+    
+    return mean, dmax, dmin, std, rmse
+
+def corr(x, y):
+    """Correlação de Pearson de arrays já alinhados via produto escalar (BLAS)
+
+    Pares com NaN são ignorados, como no pandas.
+    """
+    m = np.isfinite(x) & np.isfinite(y)
+    if m.sum() < 2:
+        return np.nan
+    xm = x[m] - x[m].mean()
+    ym = y[m] - y[m].mean()
+    return (xm @ ym) / (np.linalg.norm(xm) * np.linalg.norm(ym))
+
 def load_entsoe_data():
     """Carrega dados ENTSO-E processados"""
     print("📊 Carregando dados ENTSO-E...")
     
-    pt_prices = pd.read_csv('entsoe_data/ENTSOE_Precos_PT_Semana_2025-08-10_a_2025-08-16.csv', index_col=0)
-    pt_prices.index = pd.to_datetime(pt_prices.index)
+    # Preços day-ahead têm 2 casas decimais -- float32 é suficiente, como no OMIE
+    pt_prices = pd.read_parquet('entsoe_data/ENTSOE_Precos_PT_Semana_2025-08-10_a_2025-08-16.parquet')
+    pt_prices = pt_prices.astype({'price_eur_mwh': np.float32})
     
-    es_prices = pd.read_csv('entsoe_data/ENTSOE_Precos_ES_Semana_2025-08-10_a_2025-08-16.csv', index_col=0)
-    es_prices.index = pd.to_datetime(es_prices.index)
+    es_prices = pd.read_parquet('entsoe_data/ENTSOE_Precos_ES_Semana_2025-08-10_a_2025-08-16.parquet')
+    es_prices = es_prices.astype({'price_eur_mwh': np.float32})
     
     print(f"✅ ENTSO-E carregado: {len(pt_prices)} registros PT, {len(es_prices)} registros ES")
     
@@ -27,9 +82,8 @@ def load_omie_data():
     """Carrega dados OMIE processados"""
     print("📊 Carregando dados OMIE...")
     
-    omie_data = pd.read_csv('omie_data/OMIE_Precos_Processados_10_08_a_16_08_2025.csv')
-    omie_data['datetime_utc'] = pd.to_datetime(omie_data['datetime_utc'])
-    omie_data.set_index('datetime_utc', inplace=True)
+    # Índice UTC e dtypes (float32/int8/category) vêm preservados no Parquet
+    omie_data = pd.read_parquet('omie_data/OMIE_Precos_Processados_10_08_a_16_08_2025.parquet')
     
     print(f"✅ OMIE carregado: {len(omie_data)} registros")
     
@@ -40,7 +94,18 @@ def compare_prices(entsoe_pt, entsoe_es, omie_data):
     print("\n🔍 COMPARANDO PREÇOS ENTSO-E vs OMIE")
     print("="*60)
     
-    common_index = entsoe_pt.index.intersection(omie_data.index)
+    sources = [
+        entsoe_pt['price_eur_mwh'].rename('entsoe_pt'),
+        entsoe_es['price_eur_mwh'].rename('entsoe_es'),
+        omie_data[['price_pt_omie', 'price_es_omie']]
+    ]
+    # Horas duplicadas impedem o join -- manter a primeira ocorrência de cada fonte
+    sources = [source[~source.index.duplicated()] for source in sources]
+    
+    # Um único join interno alinha as quatro séries no período comum (índice em UTC)
+    aligned = pd.concat(sources, axis=1, join='inner')
+    aligned.index = aligned.index.tz_convert('UTC')
+    common_index = aligned.index
     
     if len(common_index) == 0:
         print("❌ Nenhum período comum encontrado!")
@@ -50,43 +115,46 @@ def compare_prices(entsoe_pt, entsoe_es, omie_data):
     print(f"📅 De: {common_index.min()}")
     print(f"📅 Até: {common_index.max()}")
     
-    entsoe_pt_aligned = entsoe_pt.loc[common_index]
-    entsoe_es_aligned = entsoe_es.loc[common_index]
-    omie_aligned = omie_data.loc[common_index]
-    
     print("\n🇵🇹 COMPARAÇÃO PORTUGAL:")
     print("-" * 40)
     
-    pt_diff = entsoe_pt_aligned['price_eur_mwh'] - omie_aligned['price_pt_omie']
-    pt_corr = entsoe_pt_aligned['price_eur_mwh'].corr(omie_aligned['price_pt_omie'])
+    pt_entsoe = aligned['entsoe_pt'].to_numpy()
+    pt_omie = aligned['price_pt_omie'].to_numpy()
+    pt_mean, pt_max, pt_min, pt_std, pt_rmse = stats_kernel(pt_entsoe, pt_omie)
+    pt_corr = corr(pt_entsoe, pt_omie)
     
-    print(f"📊 Diferença média: {pt_diff.mean():.2f} EUR/MWh")
-    print(f"📊 Diferença máxima: {pt_diff.max():.2f} EUR/MWh")
-    print(f"📊 Diferença mínima: {pt_diff.min():.2f} EUR/MWh")
-    print(f"📊 Desvio padrão: {pt_diff.std():.2f} EUR/MWh")
+    print(f"📊 Diferença média: {pt_mean:.2f} EUR/MWh")
+    print(f"📊 Diferença máxima: {pt_max:.2f} EUR/MWh")
+    print(f"📊 Diferença mínima: {pt_min:.2f} EUR/MWh")
+    print(f"📊 Desvio padrão: {pt_std:.2f} EUR/MWh")
     print(f"📈 Correlação: {pt_corr:.4f}")
     
     print("\n🇪🇸 COMPARAÇÃO ESPANHA:")
     print("-" * 40)
     
-    es_diff = entsoe_es_aligned['price_eur_mwh'] - omie_aligned['price_es_omie']
-    es_corr = entsoe_es_aligned['price_eur_mwh'].corr(omie_aligned['price_es_omie'])
+    es_entsoe = aligned['entsoe_es'].to_numpy()
+    es_omie = aligned['price_es_omie'].to_numpy()
+    es_mean, es_max, es_min, es_std, es_rmse = stats_kernel(es_entsoe, es_omie)
+    es_corr = corr(es_entsoe, es_omie)
     
-    print(f"📊 Diferença média: {es_diff.mean():.2f} EUR/MWh")
-    print(f"📊 Diferença máxima: {es_diff.max():.2f} EUR/MWh")
-    print(f"📊 Diferença mínima: {es_diff.min():.2f} EUR/MWh")
-    print(f"📊 Desvio padrão: {es_diff.std():.2f} EUR/MWh")
+    print(f"📊 Diferença média: {es_mean:.2f} EUR/MWh")
+    print(f"📊 Diferença máxima: {es_max:.2f} EUR/MWh")
+    print(f"📊 Diferença mínima: {es_min:.2f} EUR/MWh")
+    print(f"📊 Desvio padrão: {es_std:.2f} EUR/MWh")
     print(f"📈 Correlação: {es_corr:.4f}")
     
     return {
-        'pt_diff': pt_diff,
-        'es_diff': es_diff,
         'pt_corr': pt_corr,
         'es_corr': es_corr,
-        'common_index': common_index
+        'pt_mean': pt_mean,
+        'es_mean': es_mean,
+        'pt_rmse': pt_rmse,
+        'es_rmse': es_rmse,
+        'common_index': common_index,
+        'aligned': aligned
     }
 
-def create_comparison_report(entsoe_pt, entsoe_es, omie_data, comparison_results):
+def create_comparison_report(comparison_results):
     """Cria relatório de comparação"""
     print("\n📋 CRIANDO RELATÓRIO DE COMPARAÇÃO...")
     
@@ -97,21 +165,36 @@ def create_comparison_report(entsoe_pt, entsoe_es, omie_data, comparison_results
     report_file = f"{report_dir}/comparison_report_{timestamp}.csv"
     
     common_index = comparison_results['common_index']
-    entsoe_pt_aligned = entsoe_pt.loc[common_index]
-    entsoe_es_aligned = entsoe_es.loc[common_index]
-    omie_aligned = omie_data.loc[common_index]
+    aligned = comparison_results['aligned']
+    
+    # Arrays já alinhados -- o DataFrame é montado sem novo alinhamento por índice
+    pt_e = aligned['entsoe_pt'].to_numpy()
+    es_e = aligned['entsoe_es'].to_numpy()
+    om_pt = aligned['price_pt_omie'].to_numpy()
+    om_es = aligned['price_es_omie'].to_numpy()
+    
+    # Preços ficam em float32; diferenças em float64 arredondadas a 2 casas, como os preços de origem
+    pt_difference = np.round(pt_e.astype(np.float64) - om_pt, 2)
+    es_difference = np.round(es_e.astype(np.float64) - om_es, 2)
     
     comparison_df = pd.DataFrame({
         'datetime_utc': common_index,
-        'entsoe_pt_price': entsoe_pt_aligned['price_eur_mwh'],
-        'omie_pt_price': omie_aligned['price_pt_omie'],
-        'pt_difference': comparison_results['pt_diff'],
-        'entsoe_es_price': entsoe_es_aligned['price_eur_mwh'],
-        'omie_es_price': omie_aligned['price_es_omie'],
-        'es_difference': comparison_results['es_diff']
-    })
+        'entsoe_pt_price': pt_e,
+        'omie_pt_price': om_pt,
+        'pt_difference': pt_difference,
+        'entsoe_es_price': es_e,
+        'omie_es_price': om_es,
+        'es_difference': es_difference
+    }, index=common_index, copy=False)
     
-    comparison_df.to_csv(report_file, index=False)
+    # Mesmo layout do to_csv do pandas: cabeçalho sem aspas e datas como '2025-08-09 22:00:00+00:00'
+    report_table = pa.Table.from_pandas(
+        comparison_df.assign(datetime_utc=common_index.strftime('%Y-%m-%d %H:%M:%S+00:00')),
+        preserve_index=False
+    )
+    with open(report_file, 'wb') as f:
+        f.write((','.join(comparison_df.columns) + '\n').encode('utf-8'))
+        pa_csv.write_csv(report_table, f, pa_csv.WriteOptions(include_header=False, quoting_style='none'))
     
     print(f"💾 Relatório salvo: {report_file}")
     
@@ -122,18 +205,15 @@ def print_summary_statistics(comparison_results):
     print("\n📊 RESUMO ESTATÍSTICO")
     print("="*60)
     
-    pt_diff = comparison_results['pt_diff']
-    es_diff = comparison_results['es_diff']
-    
     print("🇵🇹 PORTUGAL:")
     print(f"   Correlação: {comparison_results['pt_corr']:.4f}")
-    print(f"   Diferença média: {pt_diff.mean():.2f} EUR/MWh")
-    print(f"   RMSE: {np.sqrt((pt_diff**2).mean()):.2f} EUR/MWh")
+    print(f"   Diferença média: {comparison_results['pt_mean']:.2f} EUR/MWh")
+    print(f"   RMSE: {comparison_results['pt_rmse']:.2f} EUR/MWh")
     
     print("\n🇪🇸 ESPANHA:")
     print(f"   Correlação: {comparison_results['es_corr']:.4f}")
-    print(f"   Diferença média: {es_diff.mean():.2f} EUR/MWh")
-    print(f"   RMSE: {np.sqrt((es_diff**2).mean()):.2f} EUR/MWh")
+    print(f"   Diferença média: {comparison_results['es_mean']:.2f} EUR/MWh")
+    print(f"   RMSE: {comparison_results['es_rmse']:.2f} EUR/MWh")
     
     print("\n🎯 INTERPRETAÇÃO:")
     if comparison_results['pt_corr'] > 0.95 and comparison_results['es_corr'] > 0.95:
@@ -160,7 +240,7 @@ def main():
         comparison_results = compare_prices(entsoe_pt, entsoe_es, omie_data)
         
         if comparison_results:
-            comparison_df = create_comparison_report(entsoe_pt, entsoe_es, omie_data, comparison_results)
+            comparison_df = create_comparison_report(comparison_results)
             
             print_summary_statistics(comparison_results)
             
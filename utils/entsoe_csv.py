@@ -1,14 +1,14 @@
 #!/usr/bin/env python3
 """
-Simple ENTSO-E Data Fetcher - CSV Version
-Busca dados da ENTSO-E e salva em CSV para evitar problemas de timezone
+Simple ENTSO-E Data Fetcher - Parquet/CSV Version
+Busca dados da ENTSO-E e salva preços em Parquet (timezone preservado) e geração em CSV
 """
 
 import pandas as pd
 from entsoe import EntsoePandasClient
-from datetime import datetime, timedelta
 import os
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
 load_dotenv('config.env')
@@ -17,7 +17,7 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 logger = logging.getLogger(__name__)
 
 def main():
-    """Main function to fetch ENTSO-E data and save to CSV"""
+    """Main function to fetch ENTSO-E data and save prices to Parquet and generation to CSV"""
     
     try:
         API_KEY = os.getenv('ENTSOE_API_KEY')
@@ -41,23 +41,34 @@ def main():
         
         all_files = []
         
+        # Um único timestamp (UTC) para todos os dados desta execução
+        fetch_timestamp = pd.Timestamp.now(tz='UTC')
+        
+        # Disparar todas as consultas de uma vez -- o tempo total passa a ser o da mais lenta
+        print(f"📡 Buscando preços day-ahead e geração para {', '.join(countries.values())} em paralelo...")
+        prices_futures = {}
+        generation_futures = {}
+        with ThreadPoolExecutor(max_workers=2 * len(countries)) as executor:
+            for country_code in countries.values():
+                prices_futures[country_code] = executor.submit(client.query_day_ahead_prices, country_code, start=start, end=end)
+                generation_futures[country_code] = executor.submit(client.query_generation, country_code, start=start, end=end)
+        
         for country_name, country_code in countries.items():
             print(f"\n🇪🇸🇵🇹 Processando: {country_name} ({country_code})")
             
             try:
-                print(f"💰 Buscando preços day-ahead...")
-                prices = client.query_day_ahead_prices(country_code, start=start, end=end)
+                prices = prices_futures[country_code].result()
                 
                 if prices is not None and not prices.empty:
                     prices_df = pd.DataFrame(prices, columns=['price_eur_mwh'])
-                    prices_df['country_code'] = country_code
-                    prices_df['data_source'] = 'ENTSO-E'
-                    prices_df['data_type'] = 'day_ahead_prices'
-                    prices_df['fetch_timestamp'] = datetime.now()
+                    prices_df['country_code'] = pd.Series(country_code, index=prices_df.index, dtype='category')
+                    prices_df['data_source'] = pd.Series('ENTSO-E', index=prices_df.index, dtype='category')
+                    prices_df['data_type'] = pd.Series('day_ahead_prices', index=prices_df.index, dtype='category')
+                    prices_df['fetch_timestamp'] = fetch_timestamp
                     
-                    filename = f"ENTSOE_Precos_{country_code}_Semana_{start.date()}_a_{end.date()}.csv"
+                    filename = f"ENTSOE_Precos_{country_code}_Semana_{start.date()}_a_{end.date()}.parquet"
                     filepath = os.path.join(output_dir, filename)
-                    prices_df.to_csv(filepath, index=True)
+                    prices_df.to_parquet(filepath)
                     all_files.append(filepath)
                     
                     print(f"✅ Preços salvos: {filename} ({len(prices_df)} registros)")
@@ -71,18 +82,18 @@ def main():
                 print(f"❌ Erro ao buscar preços para {country_code}: {e}")
             
             try:
-                print(f"⚡ Buscando dados de geração...")
-                generation = client.query_generation(country_code, start=start, end=end)
+                generation = generation_futures[country_code].result()
                 
                 if generation is not None and not generation.empty:
                     generation_clean = generation.dropna(axis=1, how='all')
-                    generation_clean['country_code'] = country_code
-                    generation_clean['data_source'] = 'ENTSO-E'
-                    generation_clean['data_type'] = 'generation'
-                    generation_clean['fetch_timestamp'] = datetime.now()
+                    generation_clean['country_code'] = pd.Series(country_code, index=generation_clean.index, dtype='category')
+                    generation_clean['data_source'] = pd.Series('ENTSO-E', index=generation_clean.index, dtype='category')
+                    generation_clean['data_type'] = pd.Series('generation', index=generation_clean.index, dtype='category')
+                    generation_clean['fetch_timestamp'] = fetch_timestamp
                     
                     filename = f"ENTSOE_Geracao_{country_code}_Semana_{start.date()}_a_{end.date()}.csv"
                     filepath = os.path.join(output_dir, filename)
+                    # Colunas em dois níveis (tipo, agregação) -- o writer do PyArrow não as representa
                     generation_clean.to_csv(filepath, index=True)
                     all_files.append(filepath)
                     
@@ -109,7 +120,7 @@ def main():
         print("="*60)
         
         print("\n🎉 Busca de dados concluída com sucesso!")
-        print("💡 Dica: Os arquivos CSV podem ser abertos no Excel ou outros programas")
+        print("💡 Dica: Os arquivos CSV de geração podem ser abertos no Excel ou outros programas")
         
     except Exception as e:
         logger.error(f"❌ Erro na execução: {e}")
@@ -1,91 +1,94 @@
 #!/usr/bin/env python3
 """
 Script para processar dados OMIE e converter para UTC
-Converte arquivos .TXT do OMIE para CSV com timezone UTC
+Converte arquivos .TXT do OMIE para Parquet com timezone UTC
 """
 
 import pandas as pd
+import numpy as np
 import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 import pytz
 
+_CEST = pytz.timezone('Europe/Madrid')
+_UTC = pytz.UTC
+
+_PRICE_MARKER = b'Precio marginal en el sistema '
+_DATE_RE = re.compile(rb'(\d{2}/\d{2}/\d{4})')
+
+def _parse_prices(line):
+    """
+    Extrai os preços de uma linha 'Precio marginal...' ignorando campos vazios ou inválidos
+    """
+    tail = line.split(b';', 1)[1].replace(b',', b'.').rstrip(b'; \r\n')
+    
+    # Caminho rápido: todos os campos são numéricos
+    try:
+        prices = np.fromstring(tail, sep=';', dtype=np.float64)
+    except ValueError:
+        prices = None
+    
+    # Campo vazio ou inválido (NumPy antigo só avisa e trunca) -- converter campo a campo
+    if prices is None or len(prices) != tail.count(b';') + 1:
+        values = []
+        for field in tail.split(b';'):
+            try:
+                values.append(float(field))
+            except ValueError:
+                continue
+        prices = np.array(values, dtype=np.float64)
+    
+    return prices[:24]
+
 def parse_omie_file(file_path):
     """
     Parse um arquivo OMIE .TXT e extrai os preços
+    Retorna ((data, datetime_utc, preços ES, preços PT), None) ou (None, mensagem de erro)
     """
     try:
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            content = f.read()
-        
-        date_match = re.search(r'(\d{2}/\d{2}/\d{4})', content)
-        if not date_match:
-            print(f"❌ Não foi possível extrair a data do arquivo: {file_path}")
-            return None
-        
-        file_date = datetime.strptime(date_match.group(1), '%d/%m/%Y')
-    
-        lines = content.split('\n')
+        file_date = None
         prices_es = None
         prices_pt = None
         
-        for i, line in enumerate(lines):
-            if 'Precio marginal en el sistema espa' in line:
-                prices_text = line.split(';')[1:]
-                prices_es = []
-                for price_str in prices_text:
-                    if price_str.strip():
-                        try:
-                            price_clean = price_str.strip().replace(',', '.')
-                            price = float(price_clean)
-                            prices_es.append(price)
-                        except ValueError:
-                            continue
-                break
+        # Ler linha a linha -- só a data e as duas linhas de preços interessam
+        with open(file_path, 'rb') as f:
+            for line in f:
+                if file_date is None:
+                    date_match = _DATE_RE.search(line)
+                    if date_match:
+                        # dd/mm/aaaa -- formato fixo, fatiar é bem mais rápido que strptime
+                        d = date_match.group(1)
+                        file_date = datetime(int(d[6:10]), int(d[3:5]), int(d[0:2]))
+                
+                # Uma só busca em bytes por linha; o sistema (ES/PT) vem logo após o marcador
+                pos = line.find(_PRICE_MARKER)
+                if pos >= 0:
+                    system = line[pos + len(_PRICE_MARKER):]
+                    if prices_es is None and system.startswith(b'espa'):
+                        prices_es = _parse_prices(line)
+                    elif prices_pt is None and system.startswith(b'portugu'):
+                        prices_pt = _parse_prices(line)
+                
+                if file_date is not None and prices_es is not None and prices_pt is not None:
+                    break
         
-        for i, line in enumerate(lines):
-            if 'Precio marginal en el sistema portugu' in line:
-                prices_text = line.split(';')[1:]
-                prices_pt = []
-                for price_str in prices_text:
-                    if price_str.strip():
-                        try:
-                            price_clean = price_str.strip().replace(',', '.')
-                            price = float(price_clean)
-                            prices_pt.append(price)
-                        except ValueError:
-                            continue
-                break
+        if file_date is None:
+            return None, f"Não foi possível extrair a data do arquivo: {file_path}"
         
-        if not prices_es or not prices_pt:
-            print(f"❌ Não foi possível extrair preços do arquivo: {file_path}")
-            return None
+        if prices_es is None or prices_pt is None or not len(prices_es) or not len(prices_pt):
+            return None, f"Não foi possível extrair preços do arquivo: {file_path}"
         
-        data = []
-        for hour in range(24):
-            if hour < len(prices_es) and hour < len(prices_pt):
-                # Converter para UTC -- Horario da ENTSOE   
-                local_time = datetime(file_date.year, file_date.month, file_date.day, hour, 0, 0)
-                cest_tz = pytz.timezone('Europe/Madrid')
-                utc_tz = pytz.UTC
-            
-                local_time = cest_tz.localize(local_time, is_dst=True)
-                utc_time = local_time.astimezone(utc_tz)
-                
-                data.append({
-                    'datetime_utc': utc_time,
-                    'price_es_omie': prices_es[hour],
-                    'price_pt_omie': prices_pt[hour],
-                    'date': file_date.date(),
-                    'hour_local': hour,
-                    'data_source': 'OMIE'
-                })
+        n_hours = min(len(prices_es), len(prices_pt), 24)
         
-        return pd.DataFrame(data)
+        # Converter para UTC -- Horario da ENTSOE
+        datetime_utc = pd.date_range(file_date, periods=n_hours, freq='h', tz=_CEST).tz_convert(_UTC)
+        
+        return (file_date, datetime_utc.tz_localize(None).to_numpy(), prices_es[:n_hours], prices_pt[:n_hours]), None
         
     except Exception as e:
-        print(f"❌ Erro ao processar arquivo {file_path}: {e}")
-        return None
+        return None, f"Erro ao processar arquivo {file_path}: {e}"
 
 def process_all_omie_files():
     """
@@ -104,24 +107,50 @@ def process_all_omie_files():
     
     print(f"📁 Encontrados {len(txt_files)} arquivos OMIE")
     
-    all_data = []
+    file_paths = [os.path.join(omie_dir, file_name) for file_name in txt_files]
+    
+    # Arquivos são independentes -- processar em paralelo; erros são impressos aqui, na ordem dos arquivos
+    with ProcessPoolExecutor() as executor:
+        results = list(executor.map(parse_omie_file, file_paths))
+    
+    # Cada arquivo tem no máximo 24 horas -- preencher buffers pré-alocados
+    n_max = len(txt_files) * 24
+    dt = np.empty(n_max, dtype='datetime64[ns]')
+    es = np.empty(n_max, dtype=np.float32)
+    pt = np.empty(n_max, dtype=np.float32)
+    dates = np.empty(n_max, dtype='datetime64[D]')
+    hours = np.empty(n_max, dtype=np.int8)
+    n_rows = 0
     
-    for file_name in txt_files:
-        file_path = os.path.join(omie_dir, file_name)
+    for file_name, (result, error) in zip(txt_files, results):
         print(f"📄 Processando: {file_name}")
         
-        df = parse_omie_file(file_path)
-        if df is not None:
-            all_data.append(df)
-            print(f"   ✅ {len(df)} registros extraídos")
+        if result is not None:
+            file_date, datetime_utc, prices_es, prices_pt = result
+            n_hours = len(datetime_utc)
+            rows = slice(n_rows, n_rows + n_hours)
+            dt[rows] = datetime_utc
+            es[rows] = prices_es
+            pt[rows] = prices_pt
+            dates[rows] = np.datetime64(file_date.date())
+            hours[rows] = np.arange(n_hours)
+            n_rows += n_hours
+            print(f"   ✅ {n_hours} registros extraídos")
         else:
-            print(f"   ❌ Falha ao processar")
+            print(f"   ❌ Falha ao processar: {error}")
     
-    if not all_data:
+    if n_rows == 0:
         print("❌ Nenhum dado foi processado com sucesso!")
         return None
     
-    combined_df = pd.concat(all_data, ignore_index=True)
+    combined_df = pd.DataFrame({
+        'datetime_utc': pd.DatetimeIndex(dt[:n_rows]).tz_localize('UTC'),
+        'price_es_omie': es[:n_rows],
+        'price_pt_omie': pt[:n_rows],
+        'date': dates[:n_rows].astype(object),
+        'hour_local': hours[:n_rows],
+        'data_source': pd.Categorical.from_codes(np.zeros(n_rows, dtype=np.int8), ['OMIE'])
+    })
     combined_df = combined_df.sort_values('datetime_utc').reset_index(drop=True)
     
     print(f"\n✅ Total de registros processados: {len(combined_df)}")
@@ -139,8 +168,8 @@ def save_omie_data(df):
     output_dir = 'omie_data'
     os.makedirs(output_dir, exist_ok=True)
     
-    output_file = os.path.join(output_dir, 'OMIE_Precos_Processados_10_08_a_16_08_2025.csv')
-    df.to_csv(output_file, index=False)
+    output_file = os.path.join(output_dir, 'OMIE_Precos_Processados_10_08_a_16_08_2025.parquet')
+    df.set_index('datetime_utc').to_parquet(output_file)
     
     print(f"\n💾 Dados salvos em: {output_file}")
     